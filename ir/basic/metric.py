@@ -1,3 +1,5 @@
+from typing import Optional
+
 import numpy as np
 from numpy.typing import NDArray
 
@@ -7,19 +9,30 @@ class Metric:
         """a metric class to calculate the similarity between two vectors."""
 
     @staticmethod
-    def cosine_similarity(matrix: NDArray[np.int64], vector: NDArray[np.int64]) -> NDArray:
+    def cosine_similarity(
+        matrix: NDArray[np.int64],
+        vector: NDArray[np.int64],
+        matrix_norms: Optional[NDArray] = None,
+    ) -> NDArray:
         """
         calculate the cosine similarity between documents' vector matrix and query vector.
         (the larger the cosine, the more similar the vectors are)
         cosine = (V1 * V2) / (||V1|| * ||V2||)
+        (a zero row or a zero query vector has similarity 0)
 
         Args:
             vector_1 (NDArray): the M*N documents' vector matrix
             vector_2 (NDArray): the query vector
+            matrix_norms (NDArray, optional): pre-computed norms of each row of the matrix
         """
-        cosine = np.dot(matrix, vector) / (
-            np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
-        )
+        vector_square = np.vdot(vector, vector)
+        if matrix_norms is None:
+            # squared row norms in a single pass, then one sqrt for the whole denominator
+            denominator = np.sqrt(np.einsum("ij,ij->i", matrix, matrix) * vector_square)
+        else:
+            denominator = matrix_norms * np.sqrt(vector_square)
+        # a zero vector has no direction, give it similarity 0
+        cosine = np.divide(matrix @ vector, denominator, out=np.zeros_like(denominator), where=denominator > 0)
         return cosine
 
     @staticmethod
@@ -4,8 +4,10 @@ create a document weighting class for vector space model.
 
 from collections import Counter
 from math import log
-from typing import List
+from typing import List, Optional
 
+import numpy as np
+from numpy.typing import NDArray
 from tqdm import trange
 
 from .log import setup_logger
@@ -13,7 +15,12 @@ from .log import setup_logger
 
 class Model:
     """A template for all weighting models."""
-    def __init__(self, logging_level="INFO"):
+    def __init__(self, logging_level="INFO", dtype=np.float32):
+        """
+        Args:
+            logging_level (str): logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+            dtype: floating point type of the document vectors. Defaults to np.float32.
+        """
         self._logger = setup_logger(
             filename=__file__,
             classname=self.__class__.__name__,
@@ -22,7 +29,8 @@ class Model:
         self.WEIGHTING_METHOD = ""
         self.documents_content = []
         self.vector_keyword_index = {}
-        self.documents_vector = [[]]
+        self.dtype = np.dtype(dtype)
+        self.documents_vector: NDArray = np.empty((0, 0), dtype=self.dtype)
 
     def weighting(self, *args, **kwargs):
         """placeholder method to be overridden by subclasses"""
@@ -38,9 +46,9 @@ class Model:
             if word not in self.vector_keyword_index:
                 self.vector_keyword_index[word] = len(self.vector_keyword_index)
 
-    def make_vector(self, document_content: str, parser) -> List[float]:
+    def make_vector(self, document_content: str, parser) -> NDArray:
         """build document vector with weighting model"""
-        vector = [0.0] * len(self.vector_keyword_index)
+        vector = np.zeros(len(self.vector_keyword_index), dtype=self.dtype)
         words = list(set(parser.tokenise(document_content)))
         for word in words:
             if word in self.vector_keyword_index:
@@ -55,15 +63,43 @@ class Model:
         """placeholder method to be overridden by subclasses"""
         return NotImplementedError("Subclass must implement this method") 
 
-    def make_matrix(self, documents_content: List[str], parser):
+    def make_matrix(
+        self,
+        documents_content: List[str],
+        parser,
+        memmap_path: Optional[str] = None,
+        show_progress: bool = True,
+    ) -> NDArray:
+        """
+        build the C-contiguous documents' vector matrix (of `self.dtype`) with weighting model
+
+        Args:
+            documents_content (List[str]): the contents of all documents
+            parser: a custom document parser
+            memmap_path (str, optional): file to back the matrix with `np.memmap`,
+            so it is filled in place on disk and only touched rows stay in memory
+            show_progress (bool): whether to show a progress bar or not
+        """
         self.documents_content = documents_content
         self.pre_compute()
         self._set_vector_keyword_index(parser=parser)
 
-        self.documents_vector = [
-            self.make_vector(documents_content[i], parser=parser)
-            for i in trange(len(documents_content), desc=f"Computing {self.WEIGHTING_METHOD}", ncols=90)
-        ]
+        shape = (len(documents_content), len(self.vector_keyword_index))
+        if memmap_path is None:
+            self.documents_vector = np.zeros(shape, dtype=self.dtype)
+        else:
+            self.documents_vector = np.memmap(memmap_path, dtype=self.dtype, mode="w+", shape=shape)
+        for i in trange(
+            len(documents_content),
+            desc=f"Computing {self.WEIGHTING_METHOD}",
+            ncols=90,
+            disable=not show_progress,
+            mininterval=0.5,
+            miniters=max(1, len(documents_content) // 100),
+        ):
+            self.documents_vector[i] = self.make_vector(documents_content[i], parser=parser)
+        if isinstance(self.documents_vector, np.memmap):
+            self.documents_vector.flush()
         return self.documents_vector
 
     def __str__(self):
@@ -81,8 +117,12 @@ class TFIDF(Model):
     of a word to a document in a collection or corpus, adjusted for the fact that some
     words appear more frequently in general.
     """
-    def __init__(self):
-        super().__init__()
+    def __init__(self, dtype=np.float32):
+        """
+        Args:
+            dtype: floating point type of the document vectors. Defaults to np.float32.
+        """
+        super().__init__(dtype=dtype)
         self.WEIGHTING_METHOD = "TFIDF"
         self.documents_content = []
         self._idf_cache = {}
@@ -123,20 +163,20 @@ class BM25(Model):
     Okapi `BM25` (BM is an abbreviation of best matching) is a ranking function
     used by search engines to estimate the relevance of documents to a given search query.
     """
-    def __init__(self, k1=1.5, b=0.75):
+    def __init__(self, k1=1.5, b=0.75, dtype=np.float32):
         """
         Args:
             k1 (float, optional): Turing parameter that calibrates the document term frequency
             scaling. Defaults to 1.5.
             b (float, optional): Turing parameter between 0 and 1 that determines the scaling
             by document length. Defaults to 0.75.
+            dtype: floating point type of the document vectors. Defaults to np.float32.
         """
-        super().__init__()
+        super().__init__(dtype=dtype)
         self.WEIGHTING_METHOD = "Okapi BM25"
         self.k1 = k1
         self.b = b
         self.documents_content = []
-        # self.documents_vector = []
         self._idf_cache = {}
         self.avgdl = 0
         self._logger.critical(f"Choosing model {self.WEIGHTING_METHOD}")
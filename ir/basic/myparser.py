@@ -4,7 +4,7 @@ a custom parser that tokenises a document, removes stopwords, and stems words.
 
 import os
 import string
-from typing import List
+from typing import FrozenSet, List
 
 from .log import setup_logger
 
@@ -26,18 +26,36 @@ class Parser:
         more_punctuations = ["（", "）", "，", "“", "”"]
         return punctuations + more_punctuations
 
-    def _get_stopwords(self) -> List[str]:
+    def _get_stopwords(self) -> FrozenSet[str]:
+        """stopwords as a frozenset for O(1) membership tests"""
         stopwords_file_path = self._get_stopwords_file_path()
         with open(stopwords_file_path, "r") as file:
             stopwords = [word.strip() for word in file.readlines()]
         more_stopwords = ["I"]
-        return stopwords + more_stopwords
+        return frozenset(stopwords + more_stopwords)
 
     def _get_stopwords_file_path(self) -> str:
         stopwords_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "stopwords")
         stopwords_file = "EnglishStopwords.txt"
         return os.path.join(stopwords_path, stopwords_file)
 
+    def cache_key(self) -> str:
+        """
+        describe the settings that change how documents are cleaned, to key cached models with.
+
+        Return:
+            str: language, stemmer (with the language-specific stemmer of a SnowballStemmer
+            and the mode of a PorterStemmer), stopwords and punctuations
+        """
+        stemmer = self._stemmer
+        stemmer_name = getattr(stemmer, "stemmer", stemmer).__class__.__qualname__
+        stemmer_mode = getattr(stemmer, "mode", "")
+        stemmer_stopwords = sorted(getattr(stemmer, "stopwords", ()))
+        return (
+            f"{self._language}|{stemmer.__class__.__qualname__}|{stemmer_name}|{stemmer_mode}|{stemmer_stopwords}"
+            f"|{sorted(self.stopwords)}|{self.punctuations}"
+        )
+
     def tokenise(self, document_content: str) -> List[str]:
         """
         tokenise a document content and stem words for English.
@@ -51,6 +69,20 @@ class Parser:
         # TODO: clean punctuation
         return [self.stem(word.strip()) for word in document_content.split()]
 
+    def tokenise_and_filter(self, document_content: str) -> List[str]:
+        """
+        tokenise a document content, stem words and remove stopwords in a single pass.
+
+        Args:
+            document_content (str): the content of a single document
+
+        Return:
+            List[str]: a list of word tokens without stopwords
+        """
+        stopwords = self.stopwords
+        tokens = (self.stem(word.strip()) for word in document_content.split())
+        return [token for token in tokens if token not in stopwords]
+
     def remove_stopwords(self, words_list: List[str]) -> List[str]:
         return [word for word in words_list if word not in self.stopwords]
 
@@ -2,9 +2,17 @@
 a vector space model for information retrieval with weighting.
 """
 
+import copy
+import hashlib
+import inspect
+import logging
+import multiprocessing
 import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from random import sample
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 from numpy.typing import NDArray
@@ -14,6 +22,10 @@ from .metric import Metric
 from .myparser import Parser
 from .log import setup_logger
 
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "wsm")
+# bump whenever the build output (weighting, cleaning) or the cached state layout changes
+CACHE_VERSION = 1
+
 
 class VectorSpace:
     """a vector space model for information retrieval with weighting."""
@@ -34,15 +46,24 @@ class VectorSpace:
         self.weighting_model = weighting_model
         self.parser = parser
         self.docs = None
-        self.documents_vector = [[]]
-        self.query_vector = []
+        self.documents_vector: NDArray = np.empty((0, 0), dtype=np.float32)
+        self.query_vector: NDArray = np.empty(0, dtype=np.float32)
+        self._row_norms: NDArray = np.empty(0, dtype=np.float32)
         self._is_built = False
         self._usage = ""
         self.scores: NDArray
 
         self._logger.info("Vector Space Initailized")
 
-    def build(self, documents_directory: str, sample_size: int = -1, to_sort: bool = True):
+    def build(
+        self,
+        documents_directory: str,
+        sample_size: int = -1,
+        to_sort: bool = True,
+        cache_dir: Optional[str] = None,
+        memmap_path: Optional[str] = None,
+        n_jobs: int = 1,
+    ):
         """
         a pipeline to build our vector space model
 
@@ -50,32 +71,104 @@ class VectorSpace:
             documents_directory (str): the directory containing all documents
             sample_size (int): the number of documents to sample
             to_sort (bool): whether to sort the documents by size or not
+            cache_dir (str, optional): directory to cache the built model in (e.g. `CACHE_DIR`),
+            a later build with the same settings loads it instead (a sampled build is reused as is)
+            memmap_path (str, optional): file to build the documents' vector matrix in with `np.memmap`,
+            for vocabularies too large to hold the dense matrix in memory
+            n_jobs (int): the number of processes to clean documents with (-1 means all CPUs),
+            anything but 1 needs the calling script to be guarded by `if __name__ == "__main__":`
         """
-        self.docs = Documents(directory=documents_directory, parser=self.parser, sample_size=sample_size, to_sort=to_sort, logging_level=self._logging_level)
-        self._logger.debug("Random doc before clean: \n%s", self.docs.document_contents[0])
-        self._logger.debug("Length of random doc before clean: %s", len(self.docs.document_contents[0]))
-        self.docs.clean_all_documents()
-        self._logger.debug("Random doc after clean: \n%s", self.docs.document_contents[0])
-        self._logger.debug("Length of random doc after clean: %s", len(self.docs.document_contents[0]))
-        self.docs.sort_documents_by_size()
-        self.documents_vector = self.weighting_model.make_matrix(
-            documents_content=self.docs.document_contents,
-            parser=self.parser,
-        )
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = self._get_cache_path(cache_dir, documents_directory, sample_size, to_sort)
+        if not (cache_path is not None and os.path.exists(f"{cache_path}.pkl") and self._load_cache(cache_path)):
+            self.docs = Documents(directory=documents_directory, parser=self.parser, sample_size=sample_size, to_sort=to_sort, logging_level=self._logging_level)
+            self._logger.debug("Random doc before clean: \n%s", self.docs.document_contents[0])
+            self._logger.debug("Length of random doc before clean: %s", len(self.docs.document_contents[0]))
+            self.docs.clean_all_documents(n_jobs=n_jobs)
+            self._logger.debug("Random doc after clean: \n%s", self.docs.document_contents[0])
+            self._logger.debug("Length of random doc after clean: %s", len(self.docs.document_contents[0]))
+            self.docs.sort_documents_by_size()
+            self.documents_vector = self.weighting_model.make_matrix(
+                documents_content=self.docs.document_contents,
+                parser=self.parser,
+                memmap_path=memmap_path,
+                show_progress=self._logger.isEnabledFor(logging.INFO),
+            )
+            if cache_path is not None:
+                self._save_cache(cache_path)
+        # cache the row norms once, so queries do not recompute them
+        self._row_norms = np.sqrt(np.einsum("ij,ij->i", self.documents_vector, self.documents_vector))
         self._is_built = True
         self._logger.info("Vector Space Built")
-        self._logger.info("length of documents_vector: %s", len(self.documents_vector))
-        self._logger.info("length of document_vector: %s", len(self.documents_vector[0]))
+        self._logger.info("length of documents_vector: %s", self.documents_vector.shape[0])
+        self._logger.info("length of document_vector: %s", self.documents_vector.shape[1])
+
+    def _get_cache_path(self, cache_dir: str, documents_directory: str, sample_size: int, to_sort: bool) -> str:
+        """cache path keyed by the build, model and parser settings and the documents' names, sizes and modified times"""
+        key = hashlib.blake2b()
+        key.update(f"{CACHE_VERSION}|{os.path.abspath(documents_directory)}|{sample_size}|{to_sort}".encode())
+        # constructor hyper-parameters of the weighting model (e.g. k1 and b of BM25, dtype),
+        # not its build-time state such as avgdl
+        key.update(self.weighting_model.__class__.__qualname__.encode())
+        for name in inspect.signature(self.weighting_model.__class__).parameters:
+            key.update(f"|{name}={getattr(self.weighting_model, name, None)}".encode())
+        key.update(f"|{self.parser.cache_key()}".encode())
+        with os.scandir(documents_directory) as entries:
+            for entry in sorted(entries, key=lambda entry: entry.name):
+                if entry.name.endswith(".txt"):
+                    stat = entry.stat()
+                    key.update(f"|{entry.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return os.path.join(cache_dir, key.hexdigest()[:16])
+
+    def _save_cache(self, cache_path: str):
+        """save the documents' vector matrix as `.npy` (to memory-map later) and the rest as `.pkl`"""
+        self._logger.info("Saving vector space to cache %s", cache_path)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        weighting_model = copy.copy(self.weighting_model)
+        weighting_model.documents_vector = np.empty((0, 0), dtype=weighting_model.dtype)
+        # write to temporary files and move them into place (`.pkl` last, as it marks a complete cache),
+        # so an interrupted save never leaves a truncated cache behind
+        tmp_suffix = f".{os.getpid()}.tmp"
+        with open(f"{cache_path}.npy{tmp_suffix}", "wb") as f:
+            np.save(f, self.documents_vector)
+        with open(f"{cache_path}.pkl{tmp_suffix}", "wb") as f:
+            pickle.dump({"docs": self.docs, "weighting_model": weighting_model}, f)
+        os.replace(f"{cache_path}.npy{tmp_suffix}", f"{cache_path}.npy")
+        os.replace(f"{cache_path}.pkl{tmp_suffix}", f"{cache_path}.pkl")
+
+    def _load_cache(self, cache_path: str) -> bool:
+        """
+        load the cached vector space, the documents' vector matrix is memory-mapped read-only
+
+        Return:
+            bool: whether the cache was loaded (False if it is unreadable and has to be rebuilt)
+        """
+        self._logger.info("Loading vector space from cache %s", cache_path)
+        try:
+            with open(f"{cache_path}.pkl", "rb") as f:
+                cache = pickle.load(f)
+            documents_vector = np.load(f"{cache_path}.npy", mmap_mode="r")
+        except (EOFError, pickle.UnpicklingError, ValueError, OSError) as error:
+            self._logger.warning("Cache %s is unreadable (%r), rebuilding", cache_path, error)
+            return False
+        self.docs = cache["docs"]
+        # restore the state into the weighting model passed in, rather than replacing it
+        vars(self.weighting_model).update(vars(cache["weighting_model"]))
+        self.documents_vector = documents_vector
+        self.weighting_model.documents_vector = self.documents_vector
+        return True
 
     def related(self, metric: str, doc_index: int = -1):
         """find documents that are related to the document indexed by passed index within the documents' vector."""
         if not self._is_built:
             raise Exception("The vector space model is not built yet.")
         self._logger.info("Finding related documents")
+        doc_vector = self.documents_vector[doc_index]
         if metric == "cosine":
-            self.scores = Metric.cosine_similarity(np.array(self.documents_vector), np.array(self.documents_vector[doc_index]))
+            self.scores = Metric.cosine_similarity(self.documents_vector, doc_vector, matrix_norms=self._row_norms)
         elif metric == "euclidean":
-            self.scores = Metric.euclidean_distance(np.array(self.documents_vector), np.array(self.documents_vector[doc_index]))
+            self.scores = Metric.euclidean_distance(self.documents_vector, doc_vector)
         else:
             raise Exception("Invalid metric, choose either 'cosine' or 'euclidean'")
         self._usage = "related"
@@ -89,9 +182,9 @@ class VectorSpace:
         self.query_vector = self.weighting_model.make_vector(query, parser=self.parser)
         self._logger.debug("Query Vector: \n%s", self.query_vector)
         if metric == "cosine":
-            self.scores = Metric.cosine_similarity(np.array(self.documents_vector), np.array(self.query_vector))
+            self.scores = Metric.cosine_similarity(self.documents_vector, self.query_vector, matrix_norms=self._row_norms)
         elif metric == "euclidean":
-            self.scores = Metric.euclidean_distance(np.array(self.documents_vector), np.array(self.query_vector))
+            self.scores = Metric.euclidean_distance(self.documents_vector, self.query_vector)
         else:
             raise Exception("Invalid metric, choose either 'cosine' or 'euclidean'")
         self._usage = "search"
@@ -99,15 +192,20 @@ class VectorSpace:
 
     def rank(self, top_k: int = 10) -> List[Tuple[str, NDArray]]:
         self._logger.info("Ranking documents")
-        if self._usage == "related":
-            top_k_index = np.argsort(self.scores)[-top_k:][::-1]
-        elif self._usage == "search":
-            top_k_index = np.argsort(self.scores)[-top_k:][::-1]
-        else:
+        if self._usage not in ("related", "search"):
             raise Exception("You need to call related() or search() first.")
+        # select the top k in O(N), then only order those k
+        top_k = min(top_k, len(self.scores))
+        top_k_index = np.argpartition(self.scores, -top_k)[-top_k:]
+        top_k_index = top_k_index[np.argsort(self.scores[top_k_index])[::-1]]
         return [(self.docs.document_names[i], self.scores[i]) for i in top_k_index if self.docs is not None]
 
 
+def _clean_single_document(document_content: str, parser) -> str:
+    """clean single document content (module level so it can be sent to worker processes)"""
+    return " ".join(parser.tokenise_and_filter(document_content))
+
+
 class Documents:
     def __init__(self, directory: str, parser, sample_size: int = -1, to_sort: bool = True, logging_level: str = "INFO") -> None:
         self._logger = setup_logger(
@@ -116,6 +214,7 @@ class Documents:
             level=logging_level.upper(),
         )
         self._directory = directory
+        self._path_prefix = os.path.join(directory, "")
         self._parser = parser
         self._sample_size = sample_size
         self._to_sort = to_sort
@@ -133,21 +232,20 @@ class Documents:
             sample_size (int): the number of documents to sample (-1 means all documents)
         """
         self._logger.info("Getting documents' name and content")
-        name_content = {}
-        only_text_files = [f for f in os.listdir(self._directory) if f.endswith(".txt")]
+        with os.scandir(self._directory) as entries:
+            only_text_files = [entry.name for entry in entries if entry.name.endswith(".txt") and entry.is_file()]
         if self._sample_size == -1:
             names = only_text_files
         else:
             names = sample(only_text_files, self._sample_size)
-        contents = []
-        for document in names:
-            with open(os.path.join(self._directory, document), "r") as f:
-                content = " ".join(f.readlines())
-                contents.append(content)
-        assert len(names) == len(contents)
-        for name, content in zip(names, contents):
-            name_content[name] = content
-        return name_content
+        # reading files is I/O bound, so overlap it across threads
+        with ThreadPoolExecutor() as executor:
+            return dict(zip(names, executor.map(self._read_document, names)))
+
+    def _read_document(self, document: str) -> str:
+        """read a single document content as one line"""
+        with open(self._path_prefix + document, "r", buffering=1 << 16) as f:
+            return f.read().replace("\n", " ")
 
     def _get_document_names(self) -> List[str]:
         self._logger.info("Getting documents' names")
@@ -157,22 +255,39 @@ class Documents:
         self._logger.info("Getting documents' contents")
         return list(self._info.values())
 
-    def _clean_single_document(self, document_content: str) -> str:
-        """clean single document content"""
-        cleaned_content = self._parser.tokenise(document_content)
-        cleaned_content = self._parser.remove_stopwords(cleaned_content)
-        return " ".join(cleaned_content)
-
     def _update(self):
         self._document_names = self._get_document_names()
         self._document_contents = self._get_document_contents()
         self._logger.info("Documents Updated")
 
-    def clean_all_documents(self):
-        """clean all documents content"""
+    def clean_all_documents(self, n_jobs: int = 1):
+        """
+        clean all documents content
+
+        Args:
+            n_jobs (int): the number of processes to clean documents with (-1 means all CPUs)
+        """
         self._logger.info("Cleaning all documents")
-        for name, content in tqdm(self._info.items(), desc="Cleaning documents", ncols=90):
-            self._info[name] = self._clean_single_document(content)
+        max_workers = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+        clean = partial(_clean_single_document, parser=self._parser)
+        progress = partial(
+            tqdm,
+            total=len(self._info),
+            desc="Cleaning documents",
+            ncols=90,
+            disable=not self._logger.isEnabledFor(logging.INFO),
+            mininterval=0.5,
+            miniters=max(1, len(self._info) // 100),
+        )
+        if max_workers <= 1:
+            cleaned_contents = [clean(content) for content in progress(self._info.values())]
+        else:
+            chunksize = max(1, len(self._info) // (max_workers * 4))
+            # cleaning is pure-python CPU work, so spread it across processes
+            # (spawned, since forking a process that already runs BLAS threads can deadlock)
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                cleaned_contents = list(progress(executor.map(clean, self._info.values(), chunksize=chunksize)))
+        self._info = dict(zip(self._info.keys(), cleaned_contents))
         self._update()
 
     def sort_documents_by_size(self):
@@ -181,15 +296,8 @@ class Documents:
             self._logger.info("Documents will not sort by size")
         else:
             self._logger.info("Sorting documents by size")
-            name_content = self._info
-            sorted_name_content = {}
-            name_len = {name: len(name_content[name]) for name in name_content}
-            name_len_sorted = dict(sorted(name_len.items(), key=lambda x: x[1], reverse=True))
-            new_name_content = {name: name_content[name] for name in name_len_sorted.keys()}
-            for doc, news in tqdm(zip(list(new_name_content.keys()), list(new_name_content.values())), desc="Sorting documents by size", ncols=90):
-                sorted_name_content[doc] = news
-            self._info = sorted_name_content
-        self._update()
+            self._info = dict(sorted(self._info.items(), key=lambda item: len(item[1]), reverse=True))
+            self._update()
 
     @property
     def info(self) -> Dict[str, str]:
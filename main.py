@@ -11,7 +11,7 @@ from nltk.stem import PorterStemmer, SnowballStemmer
 
 from ir.basic.model import TFIDF, BM25
 from ir.basic.myparser import Parser
-from ir.basic.vectorspace import VectorSpace
+from ir.basic.vectorspace import CACHE_DIR, VectorSpace
 
 
 def get_parser():
@@ -59,6 +59,8 @@ def print_ranking(ranking: List[Tuple]):
 def main(sample_size: int, query: str, logging_level: str):
 
     files_path = os.path.join("sample_data", "EnglishNews")
+    # only cache full builds, so every sampled run draws a new random sample
+    cache_dir = CACHE_DIR if sample_size == -1 else None
 
     # TFIDF + PorterStemmer + Cosine Similarity
     vs = VectorSpace(
@@ -66,7 +68,7 @@ def main(sample_size: int, query: str, logging_level: str):
         parser=Parser(stemmer=PorterStemmer()),
         logging_level=logging_level,
     )
-    vs.build(documents_directory=files_path, sample_size=sample_size)
+    vs.build(documents_directory=files_path, sample_size=sample_size, cache_dir=cache_dir)
     vs.search(query=query, metric="cosine")
     ranking = vs.rank(top_k=10)
     print_ranking(ranking)
@@ -77,7 +79,7 @@ def main(sample_size: int, query: str, logging_level: str):
         parser=Parser(stemmer=PorterStemmer()),
         logging_level=logging_level,
     )
-    vs.build(documents_directory=files_path, sample_size=sample_size)
+    vs.build(documents_directory=files_path, sample_size=sample_size, cache_dir=cache_dir)
     vs.search(query=query, metric="euclidean")
     ranking = vs.rank(top_k=10)
     print_ranking(ranking)
@@ -88,7 +90,7 @@ def main(sample_size: int, query: str, logging_level: str):
         parser=Parser(stemmer=SnowballStemmer(language="english")),
         logging_level=logging_level,
     )
-    vs.build(documents_directory=files_path, sample_size=sample_size)
+    vs.build(documents_directory=files_path, sample_size=sample_size, cache_dir=cache_dir)
     print("Saving the model to disk.")
     joblib.dump(vs, os.path.join("vsm", "bm25_snwball_vs.joblib"))
     vs.search(query=query, metric="euclidean")
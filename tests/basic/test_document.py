@@ -1,7 +1,41 @@
 import os
 
+import pytest
+from nltk.stem import PorterStemmer
+
+from ir.basic.myparser import Parser
 from ir.basic.vectorspace import Documents
 
 
+@pytest.fixture
+def file_path():
+    return os.path.join(os.path.dirname(os.path.dirname(__file__)), "sample_data", "EnglishNews")
+
+
 def test_documents():
     pass
+
+
+def test_read_document_single_line(file_path):
+    docs = Documents(directory=file_path, parser=Parser(), sample_size=5)
+    for name, content in docs.info.items():
+        with open(os.path.join(file_path, name), "r") as f:
+            assert content.split() == f.read().split()
+        assert "\n" not in content
+
+
+def test_sort_documents_by_size(file_path):
+    docs = Documents(directory=file_path, parser=Parser(), sample_size=-1, to_sort=True)
+    names = docs.document_names
+    docs.sort_documents_by_size()
+    lengths = [len(content) for content in docs.document_contents]
+    assert lengths == sorted(lengths, reverse=True)
+    assert sorted(docs.document_names) == sorted(names)
+
+
+def test_clean_all_documents_n_jobs(file_path):
+    docs_serial = Documents(directory=file_path, parser=Parser(stemmer=PorterStemmer()), sample_size=-1)
+    docs_serial.clean_all_documents()
+    docs_parallel = Documents(directory=file_path, parser=Parser(stemmer=PorterStemmer()), sample_size=-1)
+    docs_parallel.clean_all_documents(n_jobs=2)
+    assert docs_parallel.info == docs_serial.info
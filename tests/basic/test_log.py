@@ -0,0 +1,14 @@
+from ir.basic.log import setup_logger
+
+
+def test_setup_logger_single_handler():
+    logger_1 = setup_logger(filename="test_log", classname="A", level="INFO")
+    logger_2 = setup_logger(filename="test_log", classname="A", level="INFO")
+    assert logger_1 is logger_2
+    assert len(logger_1.handlers) == 1
+
+
+def test_setup_logger_shared_handler():
+    logger_1 = setup_logger(filename="test_log", classname="B", level="INFO")
+    logger_2 = setup_logger(filename="test_log", classname="C", level="INFO")
+    assert logger_1.handlers[0] is logger_2.handlers[0]
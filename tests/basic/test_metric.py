@@ -65,3 +65,48 @@ def test_cosine_similarity_3(documents_vector_matrix_3, query_vector):
 def test_euclidean_distance_3(documents_vector_matrix_3, query_vector):
     score = Metric.euclidean_distance(documents_vector_matrix_3, query_vector)
     assert score[0] == score[1] == 0.0
+
+
+@pytest.fixture
+def documents_vector_matrix_zero():
+    documents_vector_matrix = np.array([
+        [1, 2, 3, 4, 5],
+        [0, 0, 0, 0, 0],
+    ])
+    return documents_vector_matrix
+
+
+@pytest.fixture
+def zero_query_vector():
+    return np.zeros(5, dtype=np.int64)
+
+
+def test_cosine_similarity_zero_row(documents_vector_matrix_zero, query_vector):
+    score = Metric.cosine_similarity(documents_vector_matrix_zero, query_vector)
+    assert score[0] == 1.0
+    assert score[1] == 0.0
+
+
+def test_cosine_similarity_zero_query(documents_vector_matrix_zero, zero_query_vector):
+    score = Metric.cosine_similarity(documents_vector_matrix_zero, zero_query_vector)
+    assert np.array_equal(score, [0.0, 0.0])
+
+
+def test_cosine_similarity_matrix_norms(documents_vector_matrix_1, query_vector):
+    matrix_norms = np.linalg.norm(documents_vector_matrix_1, axis=1)
+    score = Metric.cosine_similarity(documents_vector_matrix_1, query_vector, matrix_norms=matrix_norms)
+    assert np.allclose(score, Metric.cosine_similarity(documents_vector_matrix_1, query_vector))
+
+
+@pytest.mark.parametrize("matrix_name, vector_name", [
+    ("documents_vector_matrix_1", "query_vector"),
+    ("documents_vector_matrix_zero", "query_vector"),
+    ("documents_vector_matrix_zero", "zero_query_vector"),
+])
+def test_cosine_similarity_float32_matrix_norms(matrix_name, vector_name, request):
+    matrix = request.getfixturevalue(matrix_name).astype(np.float32)
+    vector = request.getfixturevalue(vector_name).astype(np.float32)
+    matrix_norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))
+    score = Metric.cosine_similarity(matrix, vector, matrix_norms=matrix_norms)
+    assert score.dtype == np.float32
+    assert np.allclose(score, Metric.cosine_similarity(matrix, vector))
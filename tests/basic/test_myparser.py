@@ -1,7 +1,7 @@
 import os
 
 import pytest
-from nltk.stem import PorterStemmer
+from nltk.stem import PorterStemmer, SnowballStemmer
 
 from ir.basic.myparser import Parser
 
@@ -69,6 +69,12 @@ def test_tokenise_english(parser_porter):
     assert parser_porter.tokenise(words_list) == true_list
 
 
+def test_tokenise_and_filter_english(parser_porter):
+    words_list = "she is swimming for fun while he is running"
+    expected = parser_porter.remove_stopwords(parser_porter.tokenise(words_list))
+    assert parser_porter.tokenise_and_filter(words_list) == expected == ["swim", "fun", "run"]
+
+
 def test_stem_1(parser_porter):
     word = "running"
     assert parser_porter.stem(word) == "run"
@@ -81,3 +87,14 @@ def test_stem_2(parser_porter):
 def test_clean_punctuation(parser_default):
     string = "Hello, world!"
     assert parser_default._clean_punctuation(string) == "Hello  world "
+
+
+def test_stopwords_frozenset(parser_default):
+    assert isinstance(parser_default.stopwords, frozenset)
+    assert "I" in parser_default.stopwords
+
+
+def test_cache_key(parser_porter):
+    assert parser_porter.cache_key() == Parser(stemmer=PorterStemmer()).cache_key()
+    assert parser_porter.cache_key() != Parser(stemmer=PorterStemmer(mode="ORIGINAL_ALGORITHM")).cache_key()
+    assert Parser(stemmer=SnowballStemmer("english")).cache_key() != Parser(stemmer=SnowballStemmer("german")).cache_key()
@@ -1,7 +1,8 @@
 import os
 
+import numpy as np
 import pytest
-from nltk.stem import PorterStemmer
+from nltk.stem import PorterStemmer, SnowballStemmer
 
 from ir.basic.model import BM25, TFIDF
 from ir.basic.myparser import Parser
@@ -101,3 +102,106 @@ def test_tfidf_related(tfidf_with_sort):
 
 def test_bm25_related(bm25_with_sort):
     pass
+
+
+def test_tfidf_documents_vector_dtype(tfidf, file_path):
+    sample_size = 20
+    tfidf.build(documents_directory=file_path, sample_size=sample_size)
+    assert tfidf.documents_vector.dtype == np.float32
+    assert tfidf.documents_vector.shape == (sample_size, len(tfidf.weighting_model.vector_keyword_index))
+    assert tfidf.documents_vector.flags["C_CONTIGUOUS"]
+
+
+def test_tfidf_build_cache(file_path, tmp_path):
+    query = "coronavirus is a pandemic"
+    vs = VectorSpace(weighting_model=TFIDF(), parser=Parser(stemmer=PorterStemmer(), language="english"))
+    vs.build(documents_directory=file_path, sample_size=-1, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 2
+    weighting_model = TFIDF()
+    vs_cached = VectorSpace(weighting_model=weighting_model, parser=Parser(stemmer=PorterStemmer(), language="english"))
+    vs_cached.build(documents_directory=file_path, sample_size=-1, cache_dir=str(tmp_path))
+    assert isinstance(vs_cached.documents_vector, np.memmap)
+    assert vs_cached.weighting_model is weighting_model
+    assert vs_cached.docs.document_names == vs.docs.document_names
+    assert np.array_equal(vs_cached.documents_vector, vs.documents_vector)
+    assert np.allclose(vs_cached.search(query, metric="cosine"), vs.search(query, metric="cosine"))
+
+
+def test_tfidf_search_uses_query(tfidf_with_sort):
+    scores_1 = tfidf_with_sort.search("coronavirus is a pandemic", metric="cosine").copy()
+    assert tfidf_with_sort.query_vector.shape == (tfidf_with_sort.documents_vector.shape[1],)
+    assert tfidf_with_sort.query_vector.any()
+    scores_2 = tfidf_with_sort.search("football world cup", metric="cosine")
+    assert not np.allclose(scores_1, scores_2)
+
+
+def test_tfidf_rank(tfidf_with_sort):
+    scores = tfidf_with_sort.search("coronavirus is a pandemic", metric="cosine")
+    ranking = tfidf_with_sort.rank(top_k=10)
+    expected_index = np.argsort(scores)[-10:][::-1]
+    assert [score for _, score in ranking] == list(scores[expected_index])
+
+
+def test_tfidf_build_memmap(file_path, tmp_path):
+    vs = VectorSpace(weighting_model=TFIDF(), parser=Parser(stemmer=PorterStemmer(), language="english"))
+    vs.build(documents_directory=file_path, sample_size=-1, to_sort=True)
+    vs_memmap = VectorSpace(weighting_model=TFIDF(), parser=Parser(stemmer=PorterStemmer(), language="english"))
+    vs_memmap.build(documents_directory=file_path, sample_size=-1, to_sort=True, memmap_path=str(tmp_path / "matrix.dat"))
+    assert isinstance(vs_memmap.documents_vector, np.memmap)
+    assert vs_memmap.docs.document_names == vs.docs.document_names
+    assert np.array_equal(vs_memmap.documents_vector, vs.documents_vector)
+
+
+@pytest.mark.parametrize("model", [TFIDF, BM25])
+def test_float32_ranking_matches_float64(model, file_path):
+    query = "coronavirus is a pandemic"
+    rankings = []
+    for dtype in (np.float32, np.float64):
+        vs = VectorSpace(
+            weighting_model=model(dtype=dtype),
+            parser=Parser(stemmer=PorterStemmer(), language="english"),
+        )
+        vs.build(documents_directory=file_path, sample_size=-1, to_sort=True)
+        assert vs.documents_vector.dtype == dtype
+        vs.search(query, metric="cosine")
+        assert vs.query_vector.dtype == dtype
+        rankings.append(vs.rank(top_k=10))
+    assert [doc for doc, _ in rankings[0]] == [doc for doc, _ in rankings[1]]
+    assert np.allclose([score for _, score in rankings[0]], [score for _, score in rankings[1]], atol=1e-5)
+
+
+def test_bm25_build_cache_key(file_path, tmp_path):
+    vs = VectorSpace(weighting_model=BM25(), parser=Parser(stemmer=PorterStemmer(), language="english"))
+    vs.build(documents_directory=file_path, sample_size=-1, cache_dir=str(tmp_path))
+    # building twice on the same instance reuses the cache (build-time state such as avgdl is not keyed)
+    vs.build(documents_directory=file_path, sample_size=-1, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 2
+    # a different stemmer or hyper-parameter gets its own cache entry
+    vs_snowball = VectorSpace(weighting_model=BM25(), parser=Parser(stemmer=SnowballStemmer("english"), language="english"))
+    vs_snowball.build(documents_directory=file_path, sample_size=-1, cache_dir=str(tmp_path))
+    vs_k1 = VectorSpace(weighting_model=BM25(k1=1.2), parser=Parser(stemmer=PorterStemmer(), language="english"))
+    vs_k1.build(documents_directory=file_path, sample_size=-1, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 6
+
+
+@pytest.mark.parametrize("suffix", [".pkl", ".npy"])
+def test_tfidf_build_truncated_cache(file_path, tmp_path, suffix):
+    vs = VectorSpace(weighting_model=TFIDF(), parser=Parser(stemmer=PorterStemmer(), language="english"))
+    vs.build(documents_directory=file_path, sample_size=-1, cache_dir=str(tmp_path))
+    assert not list(tmp_path.glob("*.tmp"))
+    # simulate an interrupted write
+    cache_file = next(tmp_path.glob(f"*{suffix}"))
+    cache_file.write_bytes(cache_file.read_bytes()[:10])
+    vs_rebuilt = VectorSpace(weighting_model=TFIDF(), parser=Parser(stemmer=PorterStemmer(), language="english"))
+    vs_rebuilt.build(documents_directory=file_path, sample_size=-1, cache_dir=str(tmp_path))
+    assert np.array_equal(vs_rebuilt.documents_vector, vs.documents_vector)
+    # the rebuild rewrites a valid cache
+    vs_cached = VectorSpace(weighting_model=TFIDF(), parser=Parser(stemmer=PorterStemmer(), language="english"))
+    vs_cached.build(documents_directory=file_path, sample_size=-1, cache_dir=str(tmp_path))
+    assert isinstance(vs_cached.documents_vector, np.memmap)
+
+
+def test_cache_version_in_cache_key(tfidf, file_path, tmp_path, monkeypatch):
+    cache_path = tfidf._get_cache_path(str(tmp_path), file_path, sample_size=-1, to_sort=True)
+    monkeypatch.setattr("ir.basic.vectorspace.CACHE_VERSION", -1)
+    assert tfidf._get_cache_path(str(tmp_path), file_path, sample_size=-1, to_sort=True) != cache_path